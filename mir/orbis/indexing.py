@@ -14,12 +14,14 @@
 
 """File indexing."""
 
+import enum
 import filecmp
 from functools import partial
 import hashlib
 import logging
 import os
 from pathlib import Path
+from typing import NamedTuple
 
 _BUFSIZE = 2 ** 20
 
@@ -42,6 +44,55 @@ def SimpleIndexer(index_dir: 'PathLike'):
         _sha256_hash)
 
 
+def index_many(index_dir: 'PathLike',
+               paths: 'Iterable[PathLike]',
+               cache=None) -> 'Iterator[IndexResult]':
+    """Index files to index_dir, yielding an IndexResult for each file.
+
+    If cache is given, it is used for all files in the batch.  Shard
+    directories are created at most once per call.  Collisions are
+    reported as results instead of raising CollisionError.
+    """
+    index_dir = Path(index_dir)
+    made_dirs = set()
+
+    def mkdir(path: Path):
+        if path not in made_dirs:
+            path.mkdir(exist_ok=True)
+            made_dirs.add(path)
+
+    for path in paths:
+        path = Path(path)
+        digest, nbytes, cache_hit = _hash_with_stats(cache, path)
+        try:
+            outcome = _merge_link(path, _index_path(index_dir, digest, path),
+                                  mkdir=mkdir)
+        except CollisionError:
+            outcome = Outcome.COLLIDED
+        yield IndexResult(path, outcome, digest, nbytes, cache_hit)
+
+
+class Outcome(enum.Enum):
+    """Outcome of indexing a file."""
+    STORED = 'stored'
+    PRESENT = 'present'
+    MERGED = 'merged'
+    COLLIDED = 'collided'
+
+
+class IndexResult(NamedTuple):
+    """Result of indexing a file.
+
+    bytes_read is the number of bytes hashed, which is zero on a cache
+    hit.
+    """
+    path: Path
+    outcome: Outcome
+    digest: str
+    bytes_read: int
+    cache_hit: bool
+
+
 def _index_file(index_dir: 'PathLike',
                 hash_func: 'Callable[[Path], str]',
                 path: 'PathLike'):
@@ -55,8 +106,30 @@ def _index_file(index_dir: 'PathLike',
     """
     index_dir, path = Path(index_dir), Path(path)
     digest: 'str' = hash_func(path)
+    _merge_link(path, _index_path(index_dir, digest, path))
+
+
+def _index_path(index_dir: Path, digest: str, path: Path) -> Path:
+    """Return the path in index_dir for a file with the given digest."""
     ext = ''.join(path.suffixes)
-    _merge_link(path, index_dir / digest[:2] / f'{digest[2:]}{ext}')
+    return index_dir / digest[:2] / f'{digest[2:]}{ext}'
+
+
+def _hash_with_stats(cache, path: Path) -> 'Tuple[str, int, bool]':
+    """Return hex digest, bytes read, and whether the cache was hit.
+
+    cache may be None, in which case the file is always hashed.
+    """
+    if cache is None:
+        digest, nbytes = _sha256_hash_counting(path)
+        return digest, nbytes, False
+    stat = path.stat()
+    try:
+        return cache[str(path), stat], 0, True
+    except KeyError:
+        digest, nbytes = _sha256_hash_counting(path)
+        cache[str(path), stat] = digest
+        return digest, nbytes, False
 
 
 def _caching_sha256_hash(cache, path: Path) -> str:
@@ -74,41 +147,56 @@ def _caching_sha256_hash(cache, path: Path) -> str:
 
 def _sha256_hash(path: Path) -> str:
     """Return hex digest for file."""
+    return _sha256_hash_counting(path)[0]
+
+
+def _sha256_hash_counting(path: Path) -> 'Tuple[str, int]':
+    """Return hex digest for file and the number of bytes read."""
     h = hashlib.sha256()
     with open(path, 'rb') as f:
-        _feed(h, f)
-    return h.hexdigest()
+        nbytes = _feed(h, f)
+    return h.hexdigest(), nbytes
 
 
-def _merge_link(src: Path, dst: Path):
+def _merge_link(src: Path, dst: Path, mkdir=None) -> 'Outcome':
     """Merge link.
 
     Try to link src to dst.  If dst exists and is the same file as src,
     do nothing.  If dst exists, is a different file, and has the same
     contents, replace dst with a link to src.  If dst exists and has
     different contents, raise CollisionError.
+
+    mkdir is called with dst's parent directory before linking a new
+    file; by default the directory is created if it does not exist.
     """
     if not dst.exists():
         logger.info('Storing %s to %s', src, dst)
-        dst.parent.mkdir(exist_ok=True)
+        if mkdir is None:
+            dst.parent.mkdir(exist_ok=True)
+        else:
+            mkdir(dst.parent)
         os.link(src, dst)
-        return
+        return Outcome.STORED
     if dst.samefile(src):
         logger.info('%s already stored to %s', src, dst)
-        return
+        return Outcome.PRESENT
     if not filecmp.cmp(src, dst, shallow=False):
         raise CollisionError(src, dst)
     src.unlink()
     os.link(dst, src)
+    return Outcome.MERGED
 
 
 def _feed(hasher, file):
-    """Feed bytes in a file to a hasher."""
+    """Feed bytes in a file to a hasher and return the number of bytes fed."""
+    nbytes = 0
     while True:
         b = file.read(_BUFSIZE)
         if not b:
             break
         hasher.update(b)
+        nbytes += len(b)
+    return nbytes
 
 
 class CollisionError(Exception):
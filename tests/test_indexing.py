@@ -82,3 +82,63 @@ def test_CachingIndexer(tmpdir):
 
     hashed_path = hashdir.join('8b', 'c36727b5aa2a78e730bfd393836b246c4d565e4dc3e4f413df26e26656bb53.jpg')
     assert os.path.samefile(path, hashed_path)
+
+
+def test_index_many(tmpdir):
+    hashdir = tmpdir.mkdir('hash')
+    path = tmpdir.join('tmp.jpg')
+    path.write('Philosophastra Illustrans')
+    other = tmpdir.join('other')
+    other.write('Philosophastra Illustrans')
+
+    results = list(indexing.index_many(hashdir, [path, path, other]))
+
+    assert [r.outcome for r in results] == [
+        indexing.Outcome.STORED,
+        indexing.Outcome.PRESENT,
+        indexing.Outcome.STORED,
+    ]
+    assert results[0].digest == '8bc36727b5aa2a78e730bfd393836b246c4d565e4dc3e4f413df26e26656bb53'
+    assert results[0].bytes_read == 25
+    assert not results[0].cache_hit
+    hashed_path = hashdir.join('8b', 'c36727b5aa2a78e730bfd393836b246c4d565e4dc3e4f413df26e26656bb53.jpg')
+    assert os.path.samefile(path, hashed_path)
+
+
+def test_index_many_with_merge(tmpdir):
+    hashdir = tmpdir.mkdir('hash')
+    path = tmpdir.join('tmp')
+    path.write('Philosophastra Illustrans')
+    hashed_path = hashdir.join('8b', 'c36727b5aa2a78e730bfd393836b246c4d565e4dc3e4f413df26e26656bb53')
+    hashed_path.write('Philosophastra Illustrans', ensure=True)
+
+    results = list(indexing.index_many(hashdir, [path]))
+
+    assert results[0].outcome == indexing.Outcome.MERGED
+    assert os.path.samefile(str(path), str(hashed_path))
+
+
+def test_index_many_with_collision(tmpdir):
+    hashdir = tmpdir.mkdir('hash')
+    path = tmpdir.join('tmp')
+    path.write('Philosophastra Illustrans')
+    hashed_path = hashdir.join('8b', 'c36727b5aa2a78e730bfd393836b246c4d565e4dc3e4f413df26e26656bb53')
+    hashed_path.write('Pretend hash collision', ensure=True)
+
+    results = list(indexing.index_many(hashdir, [path]))
+
+    assert results[0].outcome == indexing.Outcome.COLLIDED
+
+
+def test_index_many_with_cache(tmpdir):
+    hashdir = tmpdir.mkdir('hash')
+    path = tmpdir.join('tmp')
+    path.write('Philosophastra Illustrans')
+    indexing.SimpleIndexer(hashdir)(path)
+
+    results = list(indexing.index_many(hashdir, [path, path], {}))
+
+    assert [(r.cache_hit, r.bytes_read) for r in results] == [
+        (False, 25),
+        (True, 0),
+    ]